@@ -14,18 +14,181 @@ This system showcases:
 - Performance tracking and monitoring
 """
 
+import argparse
 import asyncio
+import functools
+import io
 import logging
+import os
+import re
+import sys
 import time
-from typing import Dict, List, Optional, Tuple, Any
+import types
+from typing import Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple, Union, Any
+from collections import defaultdict
 from dataclasses import dataclass
 from enum import Enum
 import json
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Entity labels are interned so every entity shares one string object
+FOOD = sys.intern("FOOD")
+
+# Confidences are compared at this resolution, so float noise such as
+# 0.9 * 1.1 vs 0.99 cannot decide which entity wins
+CONFIDENCE_LEVELS = 255
+
+# slots=True drops the per-instance __dict__ (dataclass slots need Python 3.10+)
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Batching for real spaCy pipelines (nlp.pipe)
+NER_BATCH_SIZE = int(os.environ.get("NER_BATCH_SIZE", "64"))
+NER_N_PROCESS = int(os.environ.get("NER_N_PROCESS", max((os.cpu_count() or 1) - 1, 1)))
+
+# spaCy NER does not expose per-entity scores; model hits get a fixed confidence
+SPACY_MODEL_CONFIDENCE = 0.90
+
+# Real NLP models are opt-in and must emit a FOOD label; general-purpose
+# models (en_core_web_sm, ner-fast) do not, so nothing is loaded by default
+# and the agents use the rule-based simulation
+SPACY_MODEL = os.environ.get("NER_SPACY_MODEL")
+FLAIR_MODEL = os.environ.get("NER_FLAIR_MODEL")
+SPACY_DISABLED_COMPONENTS = ["tagger", "parser", "lemmatizer", "textcat"]
+
+@functools.lru_cache(maxsize=None)
+def _load_spacy(name: str):
+    """Load a spaCy pipeline once per process, or None if unavailable"""
+    try:
+        import spacy
+        return spacy.load(name, disable=SPACY_DISABLED_COMPONENTS)
+    except Exception as e:
+        logger.warning(f"spaCy model {name} unavailable, using rule-based NER: {str(e)}")
+        return None
+
+@functools.lru_cache(maxsize=None)
+def _load_flair(name: str):
+    """Load a Flair sequence tagger once per process, or None if unavailable"""
+    try:
+        from flair.models import SequenceTagger
+        return SequenceTagger.load(name)
+    except Exception as e:
+        logger.warning(f"Flair model {name} unavailable, using rule-based NER: {str(e)}")
+        return None
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+class _KeywordMatcher:
+    """
+    Single-pass matcher for word-bounded literal keywords
+    
+    Looks up word n-grams (joined on single spaces) in a hashed vocabulary,
+    so the cost is linear in the text length regardless of vocabulary size.
+    Matches are leftmost-longest and non-overlapping.
+    """
+    
+    def __init__(self, vocabulary: Dict[str, Any]):
+        self.vocabulary = {keyword.lower(): value for keyword, value in vocabulary.items()}
+        # First word of each multi-word keyword -> longest keyword (in words)
+        # starting with it; n-grams are only built from these words
+        self.prefix_lengths = {}
+        for keyword in self.vocabulary:
+            keyword_words = keyword.split()
+            if len(keyword_words) > 1:
+                first = keyword_words[0]
+                self.prefix_lengths[first] = max(self.prefix_lengths.get(first, 0), len(keyword_words))
+    
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str, Any]]:
+        """Yield (start, end, keyword, value) for each vocabulary hit in text"""
+        words = [(match.group().lower(), match.start(), match.end())
+                 for match in _WORD_PATTERN.finditer(text)]
+        
+        i = 0
+        while i < len(words):
+            word, start, end = words[i]
+            n, keyword, value = 1, word, None
+            
+            max_words = self.prefix_lengths.get(word)
+            if max_words is not None:
+                for n in range(min(max_words, len(words) - i), 1, -1):
+                    span = words[i:i + n]
+                    # Multi-word keywords only match across plain whitespace
+                    if any(not text[prev[2]:next_[1]].isspace() for prev, next_ in zip(span, span[1:])):
+                        continue
+                    keyword = " ".join(w for w, _, _ in span)
+                    value = self.vocabulary.get(keyword)
+                    if value is not None:
+                        end = span[-1][2]
+                        break
+                else:
+                    n, keyword = 1, word
+            
+            if value is None:
+                value = self.vocabulary.get(word)
+            
+            if value is not None:
+                yield start, end, keyword, value
+            i += n
+
+def _build_vocabulary(groups: List[Tuple[Tuple[str, ...], str, float]]) -> Dict[str, Tuple[str, float]]:
+    """Flatten keyword groups into a vocabulary; earlier groups win on repeats"""
+    vocabulary = {}
+    for keywords, label, confidence in groups:
+        for keyword in keywords:
+            vocabulary.setdefault(keyword, (label, confidence))
+    return vocabulary
+
+# Example keywords that spaCy would recognize
+_SPACY_MATCHER = _KeywordMatcher(_build_vocabulary([
+    (("chicken", "beef", "pork", "salmon", "shrimp"), FOOD, 0.95),
+    (("lettuce", "tomato", "onion", "garlic", "pepper"), FOOD, 0.90),
+    (("salt", "pepper", "oregano", "basil", "thyme"), FOOD, 0.88),
+    (("oil", "butter", "vinegar", "soy sauce"), FOOD, 0.85)
+]))
+
+# Flair excels at contextual disambiguation
+_FLAIR_MATCHER = _KeywordMatcher(_build_vocabulary([
+    (("romaine lettuce", "iceberg lettuce", "boston lettuce"), FOOD, 0.92),
+    (("grilled chicken", "baked chicken", "fried chicken"), FOOD, 0.89),
+    (("caesar dressing", "ranch dressing", "italian dressing"), FOOD, 0.87)
+]))
+
+# Sauces and dressings, mapped to the sauce type used in the inferred name
+_SAUCE_MATCHER = _KeywordMatcher({
+    "alfredo": "sauce", "marinara": "sauce", "pesto": "sauce",
+    "ranch": "dressing", "caesar": "dressing", "thousand island": "dressing",
+    "bbq": "condiment", "hot sauce": "condiment", "soy sauce": "condiment"
+})
+
+# Culinary domain knowledge base, read-only and shared by every inference agent;
+# core ingredients are (ingredient, confidence, label)
+_CULINARY_KNOWLEDGE = types.MappingProxyType({
+    "caesar_salad": types.MappingProxyType({
+        "core_ingredients": (
+            ("romaine lettuce", 0.95, FOOD),
+            ("parmesan cheese", 0.90, FOOD),
+            ("croutons", 0.85, FOOD),
+            ("caesar dressing", 0.95, FOOD)
+        ),
+        "variations": ("chicken caesar", "shrimp caesar", "vegetarian caesar")
+    }),
+    "pizza": types.MappingProxyType({
+        "core_ingredients": (
+            ("pizza dough", 0.90, FOOD),
+            ("tomato sauce", 0.85, FOOD),
+            ("mozzarella cheese", 0.80, FOOD)
+        ),
+        "toppings": ("pepperoni", "mushrooms", "olives", "bell peppers")
+    })
+})
+
+# Dish pattern rules derived from the knowledge base: the words of each dish
+# key (e.g. "caesar_salad") map to its core ingredients
+_DISH_RULES = {
+    tuple(dish.split("_")): knowledge["core_ingredients"]
+    for dish, knowledge in _CULINARY_KNOWLEDGE.items()
+}
+
 class ProcessingStage(Enum):
     """Processing stages in the ingredient intelligence pipeline"""
     ENTITY_EXTRACTION = "entity_extraction"
@@ -34,7 +197,7 @@ class ProcessingStage(Enum):
     QUALITY_VALIDATION = "quality_validation"
     INFERENCE = "inference"
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class IngredientEntity:
     """Represents an extracted ingredient entity"""
     text: str
@@ -55,6 +218,10 @@ class ProcessingResult:
     stage_results: Dict[str, Any]
     error: Optional[str] = None
 
+def _quantize_confidence(confidence: float) -> int:
+    """Map a [0, 1] confidence onto integer levels 0..CONFIDENCE_LEVELS for comparisons"""
+    return min(max(round(confidence * CONFIDENCE_LEVELS), 0), CONFIDENCE_LEVELS)
+
 class IngredientNERAgent:
     """
     Praison.ai Named Entity Recognition Agent
@@ -68,7 +235,15 @@ class IngredientNERAgent:
         self.role = "Named Entity Recognition Specialist"
         self.capabilities = ["entity_extraction", "nlp_processing", "pattern_matching"]
         self.models = ["spacy_food_ner", "flair_ingredients"]
-        
+        # Loaded models are shared by every agent in the process
+        self.spacy_nlp = _load_spacy(SPACY_MODEL) if SPACY_MODEL else None
+        self.flair_tagger = _load_flair(FLAIR_MODEL) if FLAIR_MODEL else None
+        
+    @property
+    def models_loaded(self) -> bool:
+        """Whether a real spaCy or Flair model is loaded (blocking work to overlap)"""
+        return self.spacy_nlp is not None or self.flair_tagger is not None
+    
     async def extract_entities(self, text: str) -> List[IngredientEntity]:
         """
         Extract ingredient entities from text using NLP models
@@ -79,51 +254,113 @@ class IngredientNERAgent:
         Returns:
             List of extracted ingredient entities with confidence scores
         """
+        return (await self.extract_entities_batch([text]))[0]
+    
+    async def extract_entities_batch(self, texts: List[str]) -> List[List[IngredientEntity]]:
+        """
+        Extract ingredient entities from a batch of texts
+        
+        Model calls are made once for the whole batch so a loaded spaCy
+        pipeline can stream the texts through ``nlp.pipe``.
+        
+        Args:
+            texts: Input texts to process
+            
+        Returns:
+            One list of extracted entities per input text, in input order
+        """
         start_time = time.time()
-        logger.info(f"Starting entity extraction for text: {text[:100]}...")
+        logger.info(f"Starting entity extraction for {len(texts)} texts...")
         
         try:
-            # Simulate NLP processing with spaCy + Flair models
-            entities = await self._spacy_ner_processing(text)
-            entities.extend(await self._flair_nlp_processing(text))
+            # Simulate NLP processing with spaCy + Flair models; only overlap the
+            # stages when real model calls run off the event loop
+            if self.models_loaded:
+                batch_entities, flair_batch = await asyncio.gather(
+                    self._spacy_ner_batch(texts),
+                    self._flair_ner_batch(texts)
+                )
+            else:
+                batch_entities = await self._spacy_ner_batch(texts)
+                flair_batch = await self._flair_ner_batch(texts)
             
-            # Remove duplicates and sort by position
-            unique_entities = self._deduplicate_entities(entities)
-            unique_entities.sort(key=lambda x: x.start_pos)
+            results = []
+            for entities, flair_entities in zip(batch_entities, flair_batch):
+                entities.extend(flair_entities)
+                
+                # Remove duplicate and nested spans, ordered by position
+                results.append(self._resolve_overlapping_spans(entities))
             
             processing_time = time.time() - start_time
-            logger.info(f"Extracted {len(unique_entities)} entities in {processing_time:.2f}s")
+            logger.info(f"Extracted {sum(len(r) for r in results)} entities in {processing_time:.2f}s")
             
-            return unique_entities
+            return results
             
         except Exception as e:
             logger.error(f"Entity extraction failed: {str(e)}")
-            return []
+            return [[] for _ in texts]
+    
+    async def _spacy_ner_batch(self, texts: List[str]) -> List[List[IngredientEntity]]:
+        """Process a batch with spaCy, streaming through nlp.pipe when a model is loaded"""
+        batch_entities = [await self._spacy_ner_processing(text) for text in texts]
+        
+        if self.spacy_nlp is not None:
+            # Only fan out to worker processes when there are several full batches
+            n_process = min(NER_N_PROCESS, max(1, len(texts) // NER_BATCH_SIZE))
+            # Run the blocking model call off the event loop
+            docs = await asyncio.to_thread(
+                lambda: list(self.spacy_nlp.pipe(texts, batch_size=NER_BATCH_SIZE, n_process=n_process))
+            )
+            for entities, doc in zip(batch_entities, docs):
+                entities.extend(
+                    IngredientEntity(
+                        text=ent.text,
+                        label=FOOD,
+                        confidence=SPACY_MODEL_CONFIDENCE,
+                        start_pos=ent.start_char,
+                        end_pos=ent.end_char
+                    )
+                    for ent in doc.ents if ent.label_ == FOOD
+                )
+        
+        return batch_entities
+    
+    async def _flair_ner_batch(self, texts: List[str]) -> List[List[IngredientEntity]]:
+        """Process a batch with Flair, tagging all sentences in one predict call when a model is loaded"""
+        batch_entities = [await self._flair_nlp_processing(text) for text in texts]
+        
+        if self.flair_tagger is not None:
+            from flair.data import Sentence
+            sentences = [Sentence(text) for text in texts]
+            # Run the blocking model call off the event loop
+            await asyncio.to_thread(self.flair_tagger.predict, sentences, mini_batch_size=NER_BATCH_SIZE)
+            for entities, sentence in zip(batch_entities, sentences):
+                for span in sentence.get_spans("ner"):
+                    label = span.get_label("ner")
+                    if label.value == FOOD:
+                        entities.append(IngredientEntity(
+                            text=span.text,
+                            label=FOOD,
+                            confidence=label.score,
+                            start_pos=span.start_position,
+                            end_pos=span.end_position
+                        ))
+        
+        return batch_entities
     
     async def _spacy_ner_processing(self, text: str) -> List[IngredientEntity]:
         """Process with spaCy food NER model"""
         # Simulate spaCy NER processing
         entities = []
         
-        # Example patterns that spaCy would recognize
-        patterns = [
-            (r"\b(chicken|beef|pork|salmon|shrimp)\b", "FOOD", 0.95),
-            (r"\b(lettuce|tomato|onion|garlic|pepper)\b", "FOOD", 0.90),
-            (r"\b(salt|pepper|oregano|basil|thyme)\b", "FOOD", 0.88),
-            (r"\b(oil|butter|vinegar|soy sauce)\b", "FOOD", 0.85)
-        ]
-        
-        import re
-        for pattern, label, confidence in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                entities.append(IngredientEntity(
-                    text=match.group(),
-                    label=label,
-                    confidence=confidence,
-                    start_pos=match.start(),
-                    end_pos=match.end()
-                ))
+        for start, end, _, (label, confidence) in _SPACY_MATCHER.finditer(text):
+            entities.append(IngredientEntity(
+                text=text[start:end],
+                label=label,
+                confidence=confidence,
+                start_pos=start,
+                end_pos=end
+            ))
         
         return entities
     
@@ -132,38 +369,42 @@ class IngredientNERAgent:
         # Simulate Flair NLP processing for additional entities
         entities = []
         
-        # Flair excels at contextual disambiguation
-        contextual_patterns = [
-            (r"\b(romaine|iceberg|boston)\s+(lettuce)\b", "FOOD", 0.92),
-            (r"\b(grilled|baked|fried)\s+(chicken)\b", "FOOD", 0.89),
-            (r"\b(caesar|ranch|italian)\s+(dressing)\b", "FOOD", 0.87)
-        ]
-        
-        import re
-        for pattern, label, confidence in contextual_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                entities.append(IngredientEntity(
-                    text=match.group(),
-                    label=label,
-                    confidence=confidence,
-                    start_pos=match.start(),
-                    end_pos=match.end()
-                ))
+        for start, end, _, (label, confidence) in _FLAIR_MATCHER.finditer(text):
+            entities.append(IngredientEntity(
+                text=text[start:end],
+                label=label,
+                confidence=confidence,
+                start_pos=start,
+                end_pos=end
+            ))
         
         return entities
     
-    def _deduplicate_entities(self, entities: List[IngredientEntity]) -> List[IngredientEntity]:
-        """Remove duplicate entities, keeping the highest confidence"""
-        seen_positions = {}
-        unique_entities = []
+    def _resolve_overlapping_spans(self, entities: List[IngredientEntity]) -> List[IngredientEntity]:
+        """
+        Drop entities contained in an equal-or-higher confidence span, ordered by position
         
-        for entity in entities:
-            key = (entity.start_pos, entity.end_pos)
-            if key not in seen_positions or entity.confidence > seen_positions[key].confidence:
-                seen_positions[key] = entity
+        Covers exact duplicates as well as nested spans such as "lettuce"
+        inside "romaine lettuce". A nested span with higher confidence than
+        its container is kept.
+        """
+        # Sorting by start, then longest first, puts every container before its contents
+        ordered = sorted(
+            (entity.start_pos, -entity.end_pos, -_quantize_confidence(entity.confidence), i)
+            for i, entity in enumerate(entities)
+        )
+        kept = []
+        open_spans = []  # (end_pos, confidence level) of kept spans that may contain later entities
+        
+        for start, neg_end, neg_level, i in ordered:
+            end, level = -neg_end, -neg_level
+            open_spans = [(span_end, span_level) for span_end, span_level in open_spans if span_end > start]
+            if any(span_end >= end and span_level >= level for span_end, span_level in open_spans):
+                continue
+            kept.append(entities[i])
+            open_spans.append((end, level))
         
-        return list(seen_positions.values())
+        return kept
 
 class IngredientInferenceAgent:
     """
@@ -190,121 +431,85 @@ class IngredientInferenceAgent:
         """
         logger.info(f"Inferring ingredients for dish: {dish_name}")
         
+        # Normalize and tokenize the dish name once for every stage below
+        dish_lower = dish_name.lower()
+        word_count = len(dish_lower.split())
+        
         # Analyze dish name patterns
-        ingredients = await self._analyze_dish_patterns(dish_name)
+        ingredients = await self._analyze_dish_patterns(dish_name, dish_lower)
         
         # Apply culinary intelligence
-        ingredients.extend(await self._culinary_intelligence(dish_name))
+        ingredients.extend(await self._culinary_intelligence(dish_name, dish_lower))
         
-        # Calculate confidence scores
+        # Calculate confidence scores; the adjustment depends only on the dish
+        multiplier = self._inference_confidence_multiplier(dish_lower, word_count)
         for ingredient in ingredients:
-            ingredient.confidence = self._calculate_inference_confidence(ingredient, dish_name)
+            ingredient.confidence = min(ingredient.confidence * multiplier, 1.0)
         
         return ingredients
     
-    async def _analyze_dish_patterns(self, dish_name: str) -> List[IngredientEntity]:
+    async def _analyze_dish_patterns(self, dish_name: str, dish_lower: str) -> List[IngredientEntity]:
         """Analyze common dish naming patterns"""
         ingredients = []
         
-        # Caesar Salad patterns
-        if "caesar" in dish_name.lower() and "salad" in dish_name.lower():
-            caesar_ingredients = [
-                ("romaine lettuce", 0.95, "FOOD"),
-                ("parmesan cheese", 0.90, "FOOD"),
-                ("croutons", 0.85, "FOOD"),
-                ("caesar dressing", 0.95, "FOOD")
-            ]
-            
-            for ingredient, confidence, label in caesar_ingredients:
-                ingredients.append(IngredientEntity(
-                    text=ingredient,
-                    label=label,
-                    confidence=confidence,
-                    start_pos=0,
-                    end_pos=len(dish_name)
-                ))
-        
-        # Pizza patterns
-        elif "pizza" in dish_name.lower():
-            base_ingredients = [
-                ("pizza dough", 0.90, "FOOD"),
-                ("tomato sauce", 0.85, "FOOD"),
-                ("mozzarella cheese", 0.80, "FOOD")
-            ]
-            
-            for ingredient, confidence, label in base_ingredients:
-                ingredients.append(IngredientEntity(
-                    text=ingredient,
-                    label=label,
-                    confidence=confidence,
-                    start_pos=0,
-                    end_pos=len(dish_name)
-                ))
+        # First dish type whose keys all appear in the name wins; substring
+        # matching keeps plurals such as "Pizzas" and "Salads" working
+        for key_tokens, dish_ingredients in _DISH_RULES.items():
+            if all(key in dish_lower for key in key_tokens):
+                for ingredient, confidence, label in dish_ingredients:
+                    ingredients.append(IngredientEntity(
+                        text=ingredient,
+                        label=label,
+                        confidence=confidence,
+                        start_pos=0,
+                        end_pos=len(dish_name)
+                    ))
+                break
         
         return ingredients
     
-    async def _culinary_intelligence(self, dish_name: str) -> List[IngredientEntity]:
+    async def _culinary_intelligence(self, dish_name: str, dish_lower: str) -> List[IngredientEntity]:
         """Apply culinary domain knowledge"""
         ingredients = []
         
         # Common cooking methods and ingredients
-        if "grilled" in dish_name.lower():
+        if "grilled" in dish_lower:
             proteins = ["chicken", "salmon", "steak", "shrimp"]
             for protein in proteins:
-                if protein in dish_name.lower():
+                if protein in dish_lower:
                     ingredients.append(IngredientEntity(
                         text=protein,
-                        label="FOOD",
+                        label=FOOD,
                         confidence=0.88,
                         start_pos=0,
                         end_pos=len(dish_name)
                     ))
         
         # Sauces and dressings
-        sauce_patterns = [
-            (r"\b(alfredo|marinara|pesto)\b", "sauce"),
-            (r"\b(ranch|caesar|thousand island)\b", "dressing"),
-            (r"\b(bbq|hot sauce|soy sauce)\b", "condiment")
-        ]
-        
-        import re
-        for pattern, sauce_type in sauce_patterns:
-            matches = re.findall(pattern, dish_name.lower())
-            for match in matches:
-                ingredients.append(IngredientEntity(
-                    text=f"{match} {sauce_type}",
-                    label="FOOD",
-                    confidence=0.85,
-                    start_pos=0,
-                    end_pos=len(dish_name)
-                ))
+        for _, _, match, sauce_type in _SAUCE_MATCHER.finditer(dish_name):
+            ingredients.append(IngredientEntity(
+                text=f"{match} {sauce_type}",
+                label=FOOD,
+                confidence=0.85,
+                start_pos=0,
+                end_pos=len(dish_name)
+            ))
         
         return ingredients
     
-    def _calculate_inference_confidence(self, ingredient: IngredientEntity, dish_name: str) -> float:
-        """Calculate confidence score for inferred ingredient"""
-        base_confidence = ingredient.confidence
-        
+    def _inference_confidence_multiplier(self, dish_lower: str, word_count: int) -> float:
+        """Calculate the confidence multiplier for ingredients inferred from a lowercased dish name"""
         # Adjust confidence based on dish characteristics
-        if len(dish_name.split()) <= 3:  # Short dish names are more reliable
-            base_confidence *= 1.1
-        elif "special" in dish_name.lower():  # Special items are less predictable
-            base_confidence *= 0.8
+        if word_count <= 3:  # Short dish names are more reliable
+            return 1.1
+        elif "special" in dish_lower:  # Special items are less predictable
+            return 0.8
         
-        return min(base_confidence, 1.0)
+        return 1.0
     
-    def _load_culinary_knowledge(self) -> Dict[str, Any]:
+    def _load_culinary_knowledge(self) -> Mapping[str, Any]:
         """Load culinary domain knowledge base"""
-        return {
-            "caesar_salad": {
-                "core_ingredients": ["romaine lettuce", "parmesan cheese", "croutons", "caesar dressing"],
-                "variations": ["chicken caesar", "shrimp caesar", "vegetarian caesar"]
-            },
-            "pizza": {
-                "core_ingredients": ["pizza dough", "tomato sauce", "mozzarella cheese"],
-                "toppings": ["pepperoni", "mushrooms", "olives", "bell peppers"]
-            }
-        }
+        return _CULINARY_KNOWLEDGE
 
 class IngredientOrchestrator:
     """
@@ -317,6 +522,8 @@ class IngredientOrchestrator:
     def __init__(self):
         self.ner_agent = IngredientNERAgent()
         self.inference_agent = IngredientInferenceAgent()
+        # Simple similarity check - in production, use more sophisticated methods
+        self.similarity_threshold = 0.8
         self.processing_stats = {
             "total_processed": 0,
             "successful": 0,
@@ -337,39 +544,152 @@ class IngredientOrchestrator:
         Returns:
             ProcessingResult with extracted ingredients and metadata
         """
+        return (await self.process_batch([text], [dish_description]))[0]
+    
+    async def process_batch(self, 
+                            texts: List[str], 
+                            dish_descriptions: Optional[List[Optional[str]]] = None) -> List[ProcessingResult]:
+        """
+        Batch processing pipeline for ingredient intelligence
+        
+        Entity extraction runs once for the whole batch; the remaining
+        stages run per text.
+        
+        Args:
+            texts: Texts to process (ingredient lists or dish descriptions)
+            dish_descriptions: Optional dish names for inference, aligned with texts
+            
+        Returns:
+            One ProcessingResult per text, in input order
+            
+        Raises:
+            ValueError: If dish_descriptions is not the same length as texts
+        """
+        if dish_descriptions is None:
+            dish_descriptions = [None] * len(texts)
+        elif len(dish_descriptions) != len(texts):
+            raise ValueError(
+                f"dish_descriptions has {len(dish_descriptions)} items, expected {len(texts)} to match texts"
+            )
+        if not texts:
+            return []
+        
         start_time = time.time()
-        stage_results = {}
         
-        logger.info("Starting ingredient intelligence processing...")
+        logger.info(f"Starting ingredient intelligence processing for {len(texts)} texts...")
+        
+        # Stage 1: Entity Extraction (NER) and Stage 2: Inference are independent;
+        # overlap them only when NER makes real model calls
+        if self.ner_agent.models_loaded:
+            batch_entities, batch_inferred = await asyncio.gather(
+                self.ner_agent.extract_entities_batch(texts),
+                self._infer_ingredients_batch(dish_descriptions)
+            )
+        else:
+            batch_entities = await self.ner_agent.extract_entities_batch(texts)
+            batch_inferred = await self._infer_ingredients_batch(dish_descriptions)
+        
+        # Batch stage time is shared evenly so each text counts its part once
+        shared_time = (time.time() - start_time) / len(texts)
+        
+        return [
+            await self._process_extracted_entities(entities, dish_description, inferred_entities, shared_time)
+            for entities, dish_description, inferred_entities
+            in zip(batch_entities, dish_descriptions, batch_inferred)
+        ]
+    
+    async def _infer_ingredients_batch(self, 
+                                       dish_descriptions: List[Optional[str]]) -> List[Union[List[IngredientEntity], Exception]]:
+        """
+        Infer ingredients for each dish description that was provided
+        
+        Args:
+            dish_descriptions: Optional dish names, one per text
+            
+        Returns:
+            Inferred entities per dish (empty when no description), or the
+            exception raised for that dish so it can be reported per text
+        """
+        batch_inferred = []
+        for dish_description in dish_descriptions:
+            if not dish_description:
+                batch_inferred.append([])
+                continue
+            try:
+                batch_inferred.append(await self.inference_agent.infer_ingredients_from_dish(dish_description))
+            except Exception as e:
+                batch_inferred.append(e)
+        return batch_inferred
+    
+    async def _process_extracted_entities(self, 
+                                          entities: List[IngredientEntity], 
+                                          dish_description: Optional[str], 
+                                          inferred_entities: Union[List[IngredientEntity], Exception], 
+                                          shared_time: float) -> ProcessingResult:
+        """
+        Run the post-extraction stages for a single text
+        
+        Args:
+            entities: Entities extracted by NER for this text
+            dish_description: Optional dish name used for inference
+            inferred_entities: Inferred entities, or the exception raised while inferring them
+            shared_time: This text's share of the batch extraction and inference time
+            
+        Returns:
+            ProcessingResult for this text
+        """
+        start_time = time.time()
+        stage_results = {}
         
         try:
-            # Stage 1: Entity Extraction (NER)
-            entities = await self.ner_agent.extract_entities(text)
+            inference_error = inferred_entities if isinstance(inferred_entities, Exception) else None
+            if inference_error is not None:
+                inferred_entities = []
+            all_entities = entities + inferred_entities
+            
+            # Build the merge's token index while walking the entities once;
+            # the NER pass also sums the extraction-stage confidence
+            token_sets = []
+            token_index = defaultdict(list)
+            
+            extraction_confidence = 0.0
+            for entity in entities:
+                tokens = frozenset(entity.text.lower().split())
+                for token in tokens:
+                    token_index[token].append(len(token_sets))
+                token_sets.append(tokens)
+                extraction_confidence += entity.confidence
+            for entity in inferred_entities:
+                tokens = frozenset(entity.text.lower().split())
+                for token in tokens:
+                    token_index[token].append(len(token_sets))
+                token_sets.append(tokens)
+            
             stage_results["entity_extraction"] = {
                 "entities_found": len(entities),
-                "average_confidence": sum(e.confidence for e in entities) / len(entities) if entities else 0
+                "average_confidence": extraction_confidence / len(entities) if entities else 0.0
             }
             
             # Stage 2: Inference (if dish description provided)
-            inferred_entities = []
+            if inference_error is not None:
+                raise inference_error
             if dish_description:
-                inferred_entities = await self.inference_agent.infer_ingredients_from_dish(dish_description)
                 stage_results["inference"] = {
                     "inferred_entities": len(inferred_entities),
                     "dish_name": dish_description
                 }
             
             # Combine and deduplicate all entities
-            all_entities = entities + inferred_entities
-            final_entities = self._merge_similar_entities(all_entities)
+            final_entities, final_confidence = self._merge_indexed_entities(all_entities, token_sets, token_index)
             
             # Calculate overall confidence
-            overall_confidence = self._calculate_overall_confidence(final_entities)
+            mean_confidence = final_confidence / len(final_entities) if final_entities else 0.0
+            overall_confidence = self._calculate_overall_confidence(len(final_entities), mean_confidence)
             
-            processing_time = time.time() - start_time
+            processing_time = shared_time + (time.time() - start_time)
             
             # Update statistics
-            self._update_processing_stats(final_entities, processing_time, True)
+            self._update_processing_stats(mean_confidence, processing_time, True)
             
             logger.info(f"Processing completed: {len(final_entities)} entities in {processing_time:.2f}s")
             
@@ -383,74 +703,81 @@ class IngredientOrchestrator:
         except Exception as e:
             error_msg = f"Processing failed: {str(e)}"
             logger.error(error_msg)
-            self._update_processing_stats([], 0, False)
+            self._update_processing_stats(0.0, 0, False)
             
             return ProcessingResult(
                 entities=[],
                 confidence=0.0,
-                processing_time=time.time() - start_time,
+                processing_time=shared_time + (time.time() - start_time),
                 stage_results=stage_results,
                 error=error_msg
             )
     
-    def _merge_similar_entities(self, entities: List[IngredientEntity]) -> List[IngredientEntity]:
-        """Merge similar entities to avoid duplicates"""
+    def _merge_indexed_entities(self, 
+                                entities: List[IngredientEntity], 
+                                token_sets: List[FrozenSet[str]], 
+                                token_index: Dict[str, List[int]]) -> Tuple[List[IngredientEntity], float]:
+        """
+        Merge similar entities, keeping the most confident of each group
+        
+        Args:
+            entities: Entities to merge
+            token_sets: Lowercased token set of each entity, by position
+            token_index: Token to the positions of the entities containing it
+            
+        Returns:
+            The merged entities and the sum of their confidences
+        """
+        # Entities can only be similar if they share a token, so compare
+        # each entity against its token-index neighbours instead of all pairs
         merged = []
+        confidence_sum = 0.0
         used_indices = set()
         
         for i, entity1 in enumerate(entities):
             if i in used_indices:
                 continue
-                
+            
+            candidates = sorted({
+                j for token in token_sets[i] for j in token_index[token]
+                if j > i and j not in used_indices
+            })
+            
             similar_entities = [entity1]
-            for j, entity2 in enumerate(entities[i+1:], i+1):
-                if j in used_indices:
-                    continue
-                    
-                if self._are_similar_entities(entity1, entity2):
-                    similar_entities.append(entity2)
+            for j in candidates:
+                if self._calculate_token_similarity(token_sets[i], token_sets[j]) > self.similarity_threshold:
+                    similar_entities.append(entities[j])
                     used_indices.add(j)
             
             # Keep the entity with highest confidence
-            best_entity = max(similar_entities, key=lambda e: e.confidence)
+            best_entity = max(similar_entities, key=lambda e: _quantize_confidence(e.confidence))
             merged.append(best_entity)
+            confidence_sum += best_entity.confidence
         
-        return merged
-    
-    def _are_similar_entities(self, entity1: IngredientEntity, entity2: IngredientEntity) -> bool:
-        """Check if two entities are similar enough to merge"""
-        # Simple similarity check - in production, use more sophisticated methods
-        similarity_threshold = 0.8
-        
-        text_similarity = self._calculate_text_similarity(entity1.text.lower(), entity2.text.lower())
-        return text_similarity > similarity_threshold
+        return merged, confidence_sum
     
-    def _calculate_text_similarity(self, text1: str, text2: str) -> float:
-        """Calculate text similarity using simple token overlap"""
-        tokens1 = set(text1.split())
-        tokens2 = set(text2.split())
-        
+    def _calculate_token_similarity(self, tokens1: FrozenSet[str], tokens2: FrozenSet[str]) -> float:
+        """Calculate Jaccard similarity of two token sets"""
         if not tokens1 or not tokens2:
             return 0.0
         
-        intersection = tokens1.intersection(tokens2)
-        union = tokens1.union(tokens2)
+        # |A ∪ B| = |A| + |B| - |A ∩ B|, so the union set is never built
+        shared = len(tokens1 & tokens2)
         
-        return len(intersection) / len(union)
+        return shared / (len(tokens1) + len(tokens2) - shared)
     
-    def _calculate_overall_confidence(self, entities: List[IngredientEntity]) -> float:
-        """Calculate overall confidence score"""
-        if not entities:
+    def _calculate_overall_confidence(self, entity_count: int, mean_confidence: float) -> float:
+        """Calculate overall confidence score from the entity count and mean confidence"""
+        if not entity_count:
             return 0.0
         
         # Weight by entity count and individual confidence
-        individual_confidence = sum(e.confidence for e in entities) / len(entities)
-        entity_density = min(len(entities) / 10, 1.0)  # Normalize to max 10 entities
+        entity_density = min(entity_count / 10, 1.0)  # Normalize to max 10 entities
         
-        return (individual_confidence * 0.7) + (entity_density * 0.3)
+        return (mean_confidence * 0.7) + (entity_density * 0.3)
     
-    def _update_processing_stats(self, entities: List[IngredientEntity], processing_time: float, success: bool):
-        """Update processing statistics"""
+    def _update_processing_stats(self, mean_confidence: float, processing_time: float, success: bool):
+        """Update processing statistics with a result's mean entity confidence"""
         self.processing_stats["total_processed"] += 1
         
         if success:
@@ -459,8 +786,7 @@ class IngredientOrchestrator:
         # Update rolling averages
         n = self.processing_stats["total_processed"]
         self.processing_stats["average_confidence"] = (
-            (self.processing_stats["average_confidence"] * (n-1) + 
-             sum(e.confidence for e in entities) / len(entities) if entities else 0) / n
+            (self.processing_stats["average_confidence"] * (n-1) + mean_confidence) / n
         )
         self.processing_stats["average_processing_time"] = (
             (self.processing_stats["average_processing_time"] * (n-1) + processing_time) / n
@@ -477,26 +803,36 @@ class IngredientOrchestrator:
             "throughput_per_second": 1.0 / max(self.processing_stats["average_processing_time"], 0.001)
         }
 
+@functools.lru_cache(maxsize=None)
+def get_orchestrator() -> IngredientOrchestrator:
+    """Return the process-wide orchestrator, created on first use"""
+    return IngredientOrchestrator()
+
 # Example usage and demonstration
 async def demonstrate_ingredient_intelligence():
     """Demonstrate the Praison.ai ingredient intelligence system"""
-    orchestrator = IngredientOrchestrator()
+    orchestrator = get_orchestrator()
+    # Collect the report and write it in one go at the end
+    out = io.StringIO()
+    
+    out.write("🚀 Praison.ai Ingredient Intelligence System\n")
+    out.write("=" * 50 + "\n")
     
     # Test case 1: Structured ingredient list
-    print("🧪 Test 1: Structured Ingredient List")
+    out.write("🧪 Test 1: Structured Ingredient List\n")
     ingredient_text = "2 cups romaine lettuce, chopped, 1 small chicken breast, boneless, 1/3 cup caesar dressing, salt and pepper to taste"
     
     result1 = await orchestrator.process_ingredient_intelligence(ingredient_text)
     
-    print(f"✅ Extracted {len(result1.entities)} ingredients")
-    print(f"📊 Overall confidence: {result1.confidence:.1%}")
-    print(f"⏱️ Processing time: {result1.processing_time:.2f}s")
+    out.write(f"✅ Extracted {len(result1.entities)} ingredients\n")
+    out.write(f"📊 Overall confidence: {result1.confidence:.1%}\n")
+    out.write(f"⏱️ Processing time: {result1.processing_time:.2f}s\n")
     
     for entity in result1.entities:
-        print(f"  • {entity.text} ({entity.label}) - {entity.confidence:.1%}")
+        out.write(f"  • {entity.text} ({entity.label}) - {entity.confidence:.1%}\n")
     
     # Test case 2: Dish name inference
-    print("\n🧪 Test 2: Dish Name Inference")
+    out.write("\n🧪 Test 2: Dish Name Inference\n")
     dish_name = "Chicken Caesar Salad"
     
     result2 = await orchestrator.process_ingredient_intelligence(
@@ -504,19 +840,34 @@ async def demonstrate_ingredient_intelligence():
         dish_description=dish_name
     )
     
-    print(f"✅ Inferred {len(result2.entities)} ingredients")
-    print(f"📊 Overall confidence: {result2.confidence:.1%}")
-    print(f"⏱️ Processing time: {result2.processing_time:.2f}s")
+    out.write(f"✅ Inferred {len(result2.entities)} ingredients\n")
+    out.write(f"📊 Overall confidence: {result2.confidence:.1%}\n")
+    out.write(f"⏱️ Processing time: {result2.processing_time:.2f}s\n")
     
     for entity in result2.entities:
-        print(f"  • {entity.text} ({entity.label}) - {entity.confidence:.1%}")
+        out.write(f"  • {entity.text} ({entity.label}) - {entity.confidence:.1%}\n")
     
     # Performance statistics
-    print("\n📈 Performance Statistics:")
+    out.write("\n📈 Performance Statistics:\n")
     stats = orchestrator.get_processing_stats()
-    print(json.dumps(stats, indent=2))
+    out.write(json.dumps(stats, indent=2) + "\n")
+    
+    sys.stdout.write(out.getvalue())
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Praison.ai Ingredient Intelligence System")
+    parser.add_argument("--demo", action="store_true", help="run the ingredient intelligence demonstration")
+    args = parser.parse_args(argv)
+    
+    if not args.demo:
+        parser.print_help()
+        return 0
+    
+    # Configure logging
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(demonstrate_ingredient_intelligence())
+    return 0
 
 if __name__ == "__main__":
-    print("🚀 Praison.ai Ingredient Intelligence System")
-    print("=" * 50)
-    asyncio.run(demonstrate_ingredient_intelligence())
\ No newline at end of file
+    sys.exit(main())